@@ -2,9 +2,8 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 from document_processor import DocumentProcessor
-from citation_manager import CitationManager
 import tempfile
-import base64
+import io
 
 # Load environment variables
 load_dotenv()
@@ -18,51 +17,13 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3rem;
-        font-weight: bold;
-        text-align: center;
-        color: #1f77b4;
-        margin-bottom: 2rem;
-    }
-    .sub-header {
-        font-size: 1.5rem;
-        color: #666;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .format-card {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 0.5rem 0;
-    }
-    .success-box {
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .warning-box {
-        background-color: #fff3cd;
-        border: 1px solid #ffeaa7;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .error-box {
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def load_css():
+    """Read the stylesheet once and wrap it in a style tag"""
+    with open(os.path.join(os.path.dirname(__file__), "styles.css")) as f:
+        return f"<style>{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
 
 def main():
     # Header
@@ -188,19 +149,26 @@ def main():
                 st.markdown("✅ Citations and references")
                 st.markdown("✅ Works cited/bibliography")
 
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+SUPPORTED_MIME_TYPES = ("text/plain", DOCX_MIME_TYPE)
+
+@st.cache_data(show_spinner=False)
+def extract_file_text(data, mime_type):
+    """Parse uploaded file bytes into text, once per unique upload"""
+    if mime_type == "text/plain":
+        return data.decode('utf-8')
+    from docx import Document
+    doc = Document(io.BytesIO(data))
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+
 def get_document_content(uploaded_file, text_input):
     """Extract content from uploaded file or text input"""
     if uploaded_file:
+        if uploaded_file.type not in SUPPORTED_MIME_TYPES:
+            st.error("File type not supported yet. Please use .txt or .docx files.")
+            return None
         try:
-            if uploaded_file.type == "text/plain":
-                return uploaded_file.read().decode('utf-8')
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                from docx import Document
-                doc = Document(uploaded_file)
-                return "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            else:
-                st.error("File type not supported yet. Please use .txt or .docx files.")
-                return None
+            return extract_file_text(uploaded_file.getvalue(), uploaded_file.type)
         except Exception as e:
             st.error(f"Error reading file: {str(e)}")
             return None
@@ -208,29 +176,37 @@ def get_document_content(uploaded_file, text_input):
         return text_input
     return None
 
+@st.cache_resource
+def get_processor():
+    """Create the document processor once and share it across reruns"""
+    return DocumentProcessor()
+
 def process_document(uploaded_file, text_input, format_type, metadata):
     """Process the document and format it according to the selected style"""
     
     with st.spinner("🤖 AI is analyzing and formatting your document..."):
         try:
-            # Initialize processors
-            doc_processor = DocumentProcessor()
-            citation_manager = CitationManager()
+            # Get the shared processor
+            doc_processor = get_processor()
             
             # Get document content
             content = get_document_content(uploaded_file, text_input)
             if not content:
                 return
             
+            # Extract citations once for both the formatter and the analysis
+            citations = doc_processor.citation_manager.extract_citations(content)
+            
             # Process the document
             formatted_doc = doc_processor.format_document(
                 content=content,
                 format_type=format_type,
-                metadata=metadata
+                metadata=metadata,
+                citations=citations
             )
             
             # Analyze for missing information
-            missing_info = doc_processor.analyze_missing_information(content, format_type)
+            missing_info = doc_processor.analyze_missing_information(content, format_type, citations=citations)
             
             # Display results
             st.success("✅ Document formatted successfully!")
@@ -266,10 +242,13 @@ def process_document(uploaded_file, text_input, format_type, metadata):
             st.error(f"❌ Error processing document: {str(e)}")
 
 def create_download_link(content, filename):
-    """Create a download link for the formatted document"""
-    b64 = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:file/txt;base64,{b64}" download="{filename}">📥 Download Formatted Document</a>'
-    st.markdown(href, unsafe_allow_html=True)
+    """Create a download button for the formatted document"""
+    st.download_button(
+        "📥 Download Formatted Document",
+        data=content,
+        file_name=filename,
+        mime="text/plain"
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,104 +1,146 @@
 import re
 import openai
 import os
-from typing import Dict, List, Any, Tuple
+import sys
+from collections import defaultdict
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 from datetime import datetime
 
+SUPPORTED_FORMATS = frozenset({'mla', 'apa', 'chicago', 'harvard', 'ieee'})
+
+# Compiled citation patterns
+_PAREN = re.compile(r'\(([^)]+)\)')  # (Author Page), (Author, Year)
+_BRACKET = re.compile(r'\[([^\]]+)\]')  # [Author Page], [1]
+
+# Single-pass scan over every in-text citation shape; the named group that
+# matched holds the citation text
+_CITATION = re.compile(
+    r'\((?P<paren>[^)]+)\)'  # Parenthetical citations
+    r'|\[(?P<bracket>[^\]]+)\]'  # Bracket citations
+    r'|(?P<author_year_long>[A-Z][a-z]+ [A-Z][a-z]+ \d{4})'  # Author Year patterns
+    r'|(?P<author_year_short>[A-Z][a-z]+, \d{4})'  # Author, Year patterns
+)
+# Author-year citations inside a parenthetical or bracket
+_AUTHOR_YEAR = re.compile(r'[A-Z][a-z]+ [A-Z][a-z]+ \d{4}|[A-Z][a-z]+, \d{4}')
+
+_AUTHOR_PATTERNS = (
+    re.compile(r'^([A-Z][a-z]+ [A-Z][a-z]+)'),  # First Last
+    re.compile(r'^([A-Z][a-z]+, [A-Z][a-z]+)'),  # Last, First
+    re.compile(r'^([A-Z][a-z]+)'),  # Single name
+)
+_YEAR = re.compile(r'(\d{4})')
+_PAGE = re.compile(r'(\d+)(?:\s*[pP]\.?\s*)?$')
+_QUOTED = re.compile(r'["\']([^"\']+)["\']')
+
+class Citation(NamedTuple):
+    """
+    A citation found in document content
+    """
+    text: str
+    type: str
+    author: Optional[str] = None
+    year: Optional[str] = None
+    page: Optional[str] = None
+    title: Optional[str] = None
+    source: Optional[str] = None
+    number: Optional[int] = None
+    position: int = 0
+
 class CitationManager:
     def __init__(self):
         self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         
         # Citation patterns for different formats
         self.citation_patterns = {
-            'mla': [
-                r'\(([^)]+)\)',  # (Author Page)
-                r'\[([^\]]+)\]',  # [Author Page]
-            ],
-            'apa': [
-                r'\(([^)]+)\)',  # (Author, Year)
-                r'\[([^\]]+)\]',  # [Author, Year]
-            ],
-            'chicago': [
-                r'\(([^)]+)\)',  # (Author Year, Page)
-                r'\[([^\]]+)\]',  # [Author Year, Page]
-            ],
-            'harvard': [
-                r'\(([^)]+)\)',  # (Author, Year)
-                r'\[([^\]]+)\]',  # [Author, Year]
-            ],
-            'ieee': [
-                r'\[([^\]]+)\]',  # [1], [2], etc.
-            ]
+            'mla': [_PAREN, _BRACKET],
+            'apa': [_PAREN, _BRACKET],
+            'chicago': [_PAREN, _BRACKET],
+            'harvard': [_PAREN, _BRACKET],
+            'ieee': [_BRACKET],
+        }
+        
+        # Format-specific works cited generators and in-text formatters
+        self._generators = {
+            'mla': self._generate_mla_works_cited,
+            'apa': self._generate_apa_references,
+            'chicago': self._generate_chicago_bibliography,
+            'harvard': self._generate_harvard_references,
+            'ieee': self._generate_ieee_references,
+        }
+        self._in_text_formatters = {
+            'mla': self._format_mla_citation,
+            'apa': self._format_apa_citation,
+            'chicago': self._format_chicago_citation,
+            'harvard': self._format_harvard_citation,
+            'ieee': self._format_ieee_citation,
         }
     
-    def extract_citations(self, content: str) -> List[Dict[str, Any]]:
+    def extract_citations(self, content: str) -> List[Citation]:
         """
         Extract citations from document content
         """
         citations = []
         
-        # Look for various citation patterns
-        patterns = [
-            r'\(([^)]+)\)',  # Parenthetical citations
-            r'\[([^\]]+)\]',  # Bracket citations
-            r'([A-Z][a-z]+ [A-Z][a-z]+ \d{4})',  # Author Year patterns
-            r'([A-Z][a-z]+, \d{4})',  # Author, Year patterns
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, content)
-            for match in matches:
-                citation_text = match.group(1) if match.groups() else match.group(0)
-                
-                # Analyze the citation
-                citation_info = self._analyze_citation(citation_text)
-                if citation_info:
-                    citations.append({
-                        'text': citation_text,
-                        'type': citation_info['type'],
-                        'author': citation_info.get('author'),
-                        'year': citation_info.get('year'),
-                        'page': citation_info.get('page'),
-                        'title': citation_info.get('title'),
-                        'source': citation_info.get('source'),
-                        'position': match.start()
-                    })
-        
-        return citations
+        # Look for all citation patterns in a single scan
+        for match in _CITATION.finditer(content):
+            group = match.lastgroup
+            citation_text = match.group(group)
+            
+            # Analyze the citation
+            citation_info = self._analyze_citation(citation_text)
+            if citation_info:
+                citations.append(Citation(
+                    text=citation_text,
+                    position=match.start(),
+                    **citation_info
+                ))
+            
+            if group in ('paren', 'bracket'):
+                # The span hides the citations inside it, e.g. "(see Smith, 2020)" or
+                # "(Smith, 2020; Jones, 2019)"; look for those as well
+                offset = match.start(group)
+                for inner in _AUTHOR_YEAR.finditer(citation_text):
+                    citation_info = self._analyze_citation(inner.group())
+                    if citation_info:
+                        citations.append(Citation(
+                            text=inner.group(),
+                            position=offset + inner.start(),
+                            **citation_info
+                        ))
+        
+        # Dedupe here so every phase (in-text numbering, reference lists) sees the same sequence
+        return self._dedup_citations(citations)
     
-    def _analyze_citation(self, citation_text: str) -> Dict[str, Any]:
+    def _analyze_citation(self, citation_text: str) -> Optional[Dict[str, Any]]:
         """
         Analyze a citation text to extract components
         """
         citation_text = citation_text.strip()
+        if not citation_text:
+            return None
         
         # Try to identify citation type and extract components
-        if re.match(r'^\d+$', citation_text):
+        if citation_text.isdecimal():
             # IEEE style numbered reference
             return {
                 'type': 'ieee',
                 'number': int(citation_text)
             }
         
-        # Look for author patterns
-        author_patterns = [
-            r'^([A-Z][a-z]+ [A-Z][a-z]+)',  # First Last
-            r'^([A-Z][a-z]+, [A-Z][a-z]+)',  # Last, First
-            r'^([A-Z][a-z]+)',  # Single name
-        ]
-        
+        # Look for author patterns (they all start with an uppercase letter)
+        author_patterns = _AUTHOR_PATTERNS if 'A' <= citation_text[0] <= 'Z' else ()
         for pattern in author_patterns:
-            author_match = re.match(pattern, citation_text)
+            author_match = pattern.match(citation_text)
             if author_match:
                 author = author_match.group(1)
                 remaining = citation_text[author_match.end():].strip()
                 
                 # Look for year
-                year_match = re.search(r'(\d{4})', remaining)
+                year_match = _YEAR.search(remaining)
                 year = year_match.group(1) if year_match else None
                 
                 # Look for page
-                page_match = re.search(r'(\d+)(?:\s*[pP]\.?\s*)?$', remaining)
+                page_match = _PAGE.search(remaining)
                 page = page_match.group(1) if page_match else None
                 
                 return {
@@ -111,7 +153,7 @@ class CitationManager:
         # Look for title patterns
         if '"' in citation_text or "'" in citation_text:
             # Quoted title
-            title_match = re.search(r'["\']([^"\']+)["\']', citation_text)
+            title_match = _QUOTED.search(citation_text)
             if title_match:
                 return {
                     'type': 'title',
@@ -120,329 +162,285 @@ class CitationManager:
         
         return None
     
-    def generate_works_cited(self, citations: List[Dict[str, Any]], format_type: str) -> str:
+    def generate_works_cited(self, citations: List[Citation], format_type: str) -> str:
         """
         Generate a works cited/references page based on the format
         """
         if not citations:
             return ""
         
-        if format_type == 'mla':
-            return self._generate_mla_works_cited(citations)
-        elif format_type == 'apa':
-            return self._generate_apa_references(citations)
-        elif format_type == 'chicago':
-            return self._generate_chicago_bibliography(citations)
-        elif format_type == 'harvard':
-            return self._generate_harvard_references(citations)
-        elif format_type == 'ieee':
-            return self._generate_ieee_references(citations)
-        else:
+        if format_type not in SUPPORTED_FORMATS:
             return self._generate_generic_references(citations)
+        
+        return self._generators[format_type](citations)
+    
+    def _dedup_citations(self, citations: List[Citation]) -> List[Citation]:
+        """
+        Drop repeated citations, keeping the first occurrence of each reference
+        """
+        seen = set()
+        unique = []
+        for citation in citations:
+            # Every field is parsed from the text, so distinct references (e.g. [1] and [2]) never collide
+            key = (citation.type, citation.text)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(citation)
+        return unique
+    
+    def _group_by_author(self, citations: List[Citation]) -> Dict[str, List[Citation]]:
+        """
+        Group citations by author, preserving first-seen order
+        """
+        groups = defaultdict(list)
+        for citation in citations:
+            author = sys.intern(citation.author or 'Unknown Author')
+            groups[author].append(citation)
+        return groups
     
-    def _generate_mla_works_cited(self, citations: List[Dict[str, Any]]) -> str:
+    def _generate_mla_works_cited(self, citations: List[Citation]) -> str:
         """
         Generate MLA format works cited page
         """
-        works_cited = "Works Cited\n\n"
+        parts = ["Works Cited\n\n"]
         
         # Group citations by author
-        author_citations = {}
-        for citation in citations:
-            author = citation.get('author', 'Unknown Author')
-            if author not in author_citations:
-                author_citations[author] = []
-            author_citations[author].append(citation)
+        author_citations = self._group_by_author(citations)
         
         # Generate entries
         for author, author_cits in author_citations.items():
             for i, citation in enumerate(author_cits):
                 if i == 0:
                     # First citation for this author
-                    works_cited += f"{author}. "
+                    parts.append(f"{author}. ")
                 else:
                     # Subsequent citations - use dashes
-                    works_cited += "---. "
+                    parts.append("---. ")
                 
                 # Add title if available
-                if citation.get('title'):
-                    works_cited += f'"{citation["title"]}." '
+                if citation.title:
+                    parts.append(f'"{citation.title}." ')
                 
                 # Add source if available
-                if citation.get('source'):
-                    works_cited += f"{citation['source']}, "
+                if citation.source:
+                    parts.append(f"{citation.source}, ")
                 
                 # Add year if available
-                if citation.get('year'):
-                    works_cited += f"{citation['year']}, "
+                if citation.year:
+                    parts.append(f"{citation.year}, ")
                 
                 # Add page if available
-                if citation.get('page'):
-                    works_cited += f"p. {citation['page']}.\n\n"
+                if citation.page:
+                    parts.append(f"p. {citation.page}.\n\n")
                 else:
-                    works_cited += ".\n\n"
+                    parts.append(".\n\n")
         
-        return works_cited
+        return "".join(parts)
     
-    def _generate_apa_references(self, citations: List[Dict[str, Any]]) -> str:
+    def _generate_apa_references(self, citations: List[Citation]) -> str:
         """
         Generate APA format references page
         """
-        references = "References\n\n"
+        parts = ["References\n\n"]
         
         # Group citations by author
-        author_citations = {}
-        for citation in citations:
-            author = citation.get('author', 'Unknown Author')
-            if author not in author_citations:
-                author_citations[author] = []
-            author_citations[author].append(citation)
+        author_citations = self._group_by_author(citations)
         
         # Generate entries
         for author, author_cits in author_citations.items():
             for citation in author_cits:
                 # Author name
-                references += f"{author}. "
+                parts.append(f"{author}. ")
                 
                 # Year
-                if citation.get('year'):
-                    references += f"({citation['year']}). "
+                if citation.year:
+                    parts.append(f"({citation.year}). ")
                 
                 # Title
-                if citation.get('title'):
-                    references += f"{citation['title']}. "
+                if citation.title:
+                    parts.append(f"{citation.title}. ")
                 
                 # Source
-                if citation.get('source'):
-                    references += f"{citation['source']}."
+                if citation.source:
+                    parts.append(f"{citation.source}.")
                 
                 # Page
-                if citation.get('page'):
-                    references += f" p. {citation['page']}."
+                if citation.page:
+                    parts.append(f" p. {citation.page}.")
                 
-                references += "\n\n"
+                parts.append("\n\n")
         
-        return references
+        return "".join(parts)
     
-    def _generate_chicago_bibliography(self, citations: List[Dict[str, Any]]) -> str:
+    def _generate_chicago_bibliography(self, citations: List[Citation]) -> str:
         """
         Generate Chicago format bibliography
         """
-        bibliography = "Bibliography\n\n"
+        parts = ["Bibliography\n\n"]
         
         # Group citations by author
-        author_citations = {}
-        for citation in citations:
-            author = citation.get('author', 'Unknown Author')
-            if author not in author_citations:
-                author_citations[author] = []
-            author_citations[author].append(citation)
+        author_citations = self._group_by_author(citations)
         
         # Generate entries
         for author, author_cits in author_citations.items():
             for citation in author_cits:
-                bibliography += f"{author}. "
+                parts.append(f"{author}. ")
                 
                 # Title
-                if citation.get('title'):
-                    bibliography += f'"{citation["title"]}." '
+                if citation.title:
+                    parts.append(f'"{citation.title}." ')
                 
                 # Source
-                if citation.get('source'):
-                    bibliography += f"{citation['source']}, "
+                if citation.source:
+                    parts.append(f"{citation.source}, ")
                 
                 # Year
-                if citation.get('year'):
-                    bibliography += f"{citation['year']}."
+                if citation.year:
+                    parts.append(f"{citation.year}.")
                 
                 # Page
-                if citation.get('page'):
-                    bibliography += f" {citation['page']}."
+                if citation.page:
+                    parts.append(f" {citation.page}.")
                 
-                bibliography += "\n\n"
+                parts.append("\n\n")
         
-        return bibliography
+        return "".join(parts)
     
-    def _generate_harvard_references(self, citations: List[Dict[str, Any]]) -> str:
+    def _generate_harvard_references(self, citations: List[Citation]) -> str:
         """
         Generate Harvard format reference list
         """
-        references = "Reference List\n\n"
+        parts = ["Reference List\n\n"]
         
         # Group citations by author
-        author_citations = {}
-        for citation in citations:
-            author = citation.get('author', 'Unknown Author')
-            if author not in author_citations:
-                author_citations[author] = []
-            author_citations[author].append(citation)
+        author_citations = self._group_by_author(citations)
         
         # Generate entries
         for author, author_cits in author_citations.items():
             for citation in author_cits:
-                references += f"{author}. "
+                parts.append(f"{author}. ")
                 
                 # Year
-                if citation.get('year'):
-                    references += f"({citation['year']}). "
+                if citation.year:
+                    parts.append(f"({citation.year}). ")
                 
                 # Title
-                if citation.get('title'):
-                    references += f"{citation['title']}. "
+                if citation.title:
+                    parts.append(f"{citation.title}. ")
                 
                 # Source
-                if citation.get('source'):
-                    references += f"{citation['source']}."
+                if citation.source:
+                    parts.append(f"{citation.source}.")
                 
-                references += "\n\n"
+                parts.append("\n\n")
         
-        return references
+        return "".join(parts)
     
-    def _generate_ieee_references(self, citations: List[Dict[str, Any]]) -> str:
+    def _generate_ieee_references(self, citations: List[Citation]) -> str:
         """
         Generate IEEE format reference list
         """
-        references = "References\n\n"
+        parts = ["References\n\n"]
+        append = parts.append
         
         # Number citations
         for i, citation in enumerate(citations, 1):
-            references += f"[{i}] "
+            author, title, source = citation.author, citation.title, citation.source
+            year, page = citation.year, citation.page
+            
+            append(f"[{i}] ")
             
             # Author
-            if citation.get('author'):
-                references += f"{citation['author']}, "
+            if author:
+                append(f"{author}, ")
             
             # Title
-            if citation.get('title'):
-                references += f'"{citation["title"]}," '
+            if title:
+                append(f'"{title}," ')
             
             # Source
-            if citation.get('source'):
-                references += f"{citation['source']}, "
+            if source:
+                append(f"{source}, ")
             
             # Year
-            if citation.get('year'):
-                references += f"{citation['year']}."
+            if year:
+                append(f"{year}.")
             
             # Page
-            if citation.get('page'):
-                references += f" pp. {citation['page']}."
+            if page:
+                append(f" pp. {page}.")
             
-            references += "\n\n"
+            append("\n\n")
         
-        return references
+        return "".join(parts)
     
-    def _generate_generic_references(self, citations: List[Dict[str, Any]]) -> str:
+    def _generate_generic_references(self, citations: List[Citation]) -> str:
         """
         Generate a generic reference list
         """
-        references = "References\n\n"
+        parts = ["References\n\n"]
+        append = parts.append
         
         for i, citation in enumerate(citations, 1):
-            references += f"{i}. "
+            author, title, source = citation.author, citation.title, citation.source
+            year, page = citation.year, citation.page
+            
+            append(f"{i}. ")
             
-            if citation.get('author'):
-                references += f"{citation['author']}, "
+            if author:
+                append(f"{author}, ")
             
-            if citation.get('title'):
-                references += f'"{citation["title"]}," '
+            if title:
+                append(f'"{title}," ')
             
-            if citation.get('source'):
-                references += f"{citation['source']}, "
+            if source:
+                append(f"{source}, ")
             
-            if citation.get('year'):
-                references += f"{citation['year']}."
+            if year:
+                append(f"{year}.")
             
-            if citation.get('page'):
-                references += f" p. {citation['page']}."
+            if page:
+                append(f" p. {page}.")
             
-            references += "\n\n"
+            append("\n\n")
         
-        return references
+        return "".join(parts)
     
-    def format_in_text_citation(self, citation: Dict[str, Any], format_type: str) -> str:
+    def format_in_text_citation(self, citation: Citation, format_type: str) -> str:
         """
         Format an in-text citation according to the specified format
         """
-        if format_type == 'mla':
-            return self._format_mla_citation(citation)
-        elif format_type == 'apa':
-            return self._format_apa_citation(citation)
-        elif format_type == 'chicago':
-            return self._format_chicago_citation(citation)
-        elif format_type == 'harvard':
-            return self._format_harvard_citation(citation)
-        elif format_type == 'ieee':
-            return self._format_ieee_citation(citation)
-        else:
-            return self._format_generic_citation(citation)
+        formatter = self._in_text_formatters.get(format_type, self._format_generic_citation)
+        return formatter(citation)
     
-    def _format_mla_citation(self, citation: Dict[str, Any]) -> str:
+    def _format_mla_citation(self, citation: Citation) -> str:
         """Format MLA in-text citation"""
-        parts = []
-        
-        if citation.get('author'):
-            parts.append(citation['author'])
-        
-        if citation.get('page'):
-            parts.append(citation['page'])
-        
-        return f"({' '.join(parts)})"
+        parts = (citation.author, citation.page)
+        return f"({' '.join(part for part in parts if part)})"
     
-    def _format_apa_citation(self, citation: Dict[str, Any]) -> str:
+    def _format_apa_citation(self, citation: Citation) -> str:
         """Format APA in-text citation"""
-        parts = []
-        
-        if citation.get('author'):
-            parts.append(citation['author'])
-        
-        if citation.get('year'):
-            parts.append(citation['year'])
-        
-        if citation.get('page'):
-            parts.append(f"p. {citation['page']}")
-        
-        return f"({', '.join(parts)})"
+        page = citation.page
+        parts = (citation.author, citation.year, f"p. {page}" if page else None)
+        return f"({', '.join(part for part in parts if part)})"
     
-    def _format_chicago_citation(self, citation: Dict[str, Any]) -> str:
+    def _format_chicago_citation(self, citation: Citation) -> str:
         """Format Chicago in-text citation"""
-        parts = []
-        
-        if citation.get('author'):
-            parts.append(citation['author'])
-        
-        if citation.get('year'):
-            parts.append(citation['year'])
-        
-        if citation.get('page'):
-            parts.append(f"p. {citation['page']}")
-        
-        return f"({' '.join(parts)})"
+        page = citation.page
+        parts = (citation.author, citation.year, f"p. {page}" if page else None)
+        return f"({' '.join(part for part in parts if part)})"
     
-    def _format_harvard_citation(self, citation: Dict[str, Any]) -> str:
+    def _format_harvard_citation(self, citation: Citation) -> str:
         """Format Harvard in-text citation"""
-        parts = []
-        
-        if citation.get('author'):
-            parts.append(citation['author'])
-        
-        if citation.get('year'):
-            parts.append(citation['year'])
-        
-        return f"({', '.join(parts)})"
+        parts = (citation.author, citation.year)
+        return f"({', '.join(part for part in parts if part)})"
     
-    def _format_ieee_citation(self, citation: Dict[str, Any]) -> str:
+    def _format_ieee_citation(self, citation: Citation) -> str:
         """Format IEEE in-text citation"""
-        return f"[{citation.get('number', '?')}]"
+        return f"[{citation.number or '?'}]"
     
-    def _format_generic_citation(self, citation: Dict[str, Any]) -> str:
+    def _format_generic_citation(self, citation: Citation) -> str:
         """Format generic in-text citation"""
-        parts = []
-        
-        if citation.get('author'):
-            parts.append(citation['author'])
-        
-        if citation.get('year'):
-            parts.append(citation['year'])
-        
-        return f"({', '.join(parts)})"
+        parts = (citation.author, citation.year)
+        return f"({', '.join(part for part in parts if part)})"
@@ -1,43 +1,97 @@
+import io
 import re
 import openai
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+from format_converters.base_converter import BaseConverter
 from format_converters.mla_converter import MLAConverter
 from format_converters.apa_converter import APAConverter
 from format_converters.chicago_converter import ChicagoConverter
 from format_converters.harvard_converter import HarvardConverter
 from format_converters.ieee_converter import IEEEConverter
-from citation_manager import CitationManager
+from format_converters._patterns import HEADER_RE, SENTENCE_END_RE
+from citation_manager import Citation, CitationManager
+
+# Document feature patterns, matched case-insensitively so content never has to be lowercased.
+# Each feature is searched separately: a search stops at the first hit and keeps the
+# literal-prefix fast path, which a single alternation over every feature would lose.
+_FEATURE_PATTERNS = {
+    'title_page': re.compile(r'title:|author:|course:|instructor:|date:', re.IGNORECASE),
+    'abstract': re.compile(r'\b(?:abstract|summary)\b', re.IGNORECASE),
+    'introduction': re.compile(r'\b(?:introduction|intro)\b', re.IGNORECASE),
+    'conclusion': re.compile(r'\b(?:conclusion|concluding)\b', re.IGNORECASE),
+    'works_cited': re.compile(r'\b(?:works cited|bibliography)\b', re.IGNORECASE),
+    'references': re.compile(r'\b(?:references|reference list)\b', re.IGNORECASE),
+    'running_head': re.compile(r'running head', re.IGNORECASE),
+    'bibliography': re.compile(r'bibliography', re.IGNORECASE),
+    'page_numbers': re.compile(r'page \d+|pp?\. \d+', re.IGNORECASE),
+    'footnotes': re.compile(r'\d+\.\s|\[\d+\]'),
+    'numbered_references': re.compile(r'\[\d+\]'),
+    'proper_quotes': re.compile(r'"[^"]*"|\'[^\']*\''),
+    'citations': re.compile(r'\([^)]*\)|\[[^\]]*\]'),
+    'numbers': re.compile(r'\d+'),
+    # A d/m/yyyy date always contains a four-digit run, so that run alone decides the feature
+    'dates': re.compile(r'\d{4}'),
+}
+
+# Features every format needs, and the extra ones each format checks
+_COMMON_FEATURES = ('title_page', 'introduction', 'conclusion', 'proper_quotes', 'page_numbers')
+_FORMAT_FEATURES = {
+    'mla': ('works_cited',),
+    'apa': ('abstract', 'references', 'running_head'),
+    'chicago': ('footnotes', 'bibliography'),
+    'ieee': ('abstract', 'numbered_references'),
+}
+_STRUCTURE_FEATURES = ('citations', 'numbers', 'dates')
+
+# Below these sizes a document is a stub: too short to analyze at all, or to check format requirements
+_MIN_ANALYSIS_LENGTH = 200
+_MIN_FORMAT_CHECK_WORDS = 50
 
 class DocumentProcessor:
     def __init__(self):
         self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.citation_manager = CitationManager()
         
-        # Initialize format converters
-        self.converters = {
-            'mla': MLAConverter(),
-            'apa': APAConverter(),
-            'chicago': ChicagoConverter(),
-            'harvard': HarvardConverter(),
-            'ieee': IEEEConverter()
+        # Format converters, created on first use
+        self._converter_classes = {
+            'mla': MLAConverter,
+            'apa': APAConverter,
+            'chicago': ChicagoConverter,
+            'harvard': HarvardConverter,
+            'ieee': IEEEConverter
         }
+        self._converters = {}
+    
+    def _get_converter(self, format_type: str) -> BaseConverter:
+        """
+        Return the converter for a format, creating it on first use
+        """
+        converter = self._converters.get(format_type)
+        if converter is None:
+            converter_class = self._converter_classes.get(format_type)
+            if not converter_class:
+                raise ValueError(f"Unsupported format: {format_type}")
+            converter = converter_class(self.citation_manager)
+            self._converters[format_type] = converter
+        return converter
     
-    def format_document(self, content: str, format_type: str, metadata: Dict[str, Any]) -> str:
+    def format_document(self, content: str, format_type: str, metadata: Dict[str, Any],
+                        citations: Optional[List[Citation]] = None) -> str:
         """
-        Format a document according to the specified academic format
+        Format a document according to the specified academic format.
+        Pass already-extracted citations to skip extracting them again.
         """
         try:
             # Get the appropriate converter
-            converter = self.converters.get(format_type)
-            if not converter:
-                raise ValueError(f"Unsupported format: {format_type}")
+            converter = self._get_converter(format_type)
             
             # Analyze document structure
             analysis = self._analyze_document_structure(content)
             
             # Extract and process citations
-            citations = self.citation_manager.extract_citations(content)
+            if citations is None:
+                citations = self.citation_manager.extract_citations(content)
             
             # Format the document
             formatted_doc = converter.convert(
@@ -52,56 +106,67 @@ class DocumentProcessor:
         except Exception as e:
             raise Exception(f"Error formatting document: {str(e)}")
     
-    def analyze_missing_information(self, content: str, format_type: str) -> List[str]:
+    def analyze_missing_information(self, content: str, format_type: str,
+                                    citations: Optional[List[Citation]] = None) -> List[str]:
         """
-        Analyze the document for missing information required for proper formatting
+        Analyze the document for missing information required for proper formatting.
+        Pass already-extracted citations to skip extracting them again.
         """
+        if len(content) < _MIN_ANALYSIS_LENGTH:
+            return ["Document too short for meaningful analysis"]
+        
         missing_info = []
         
+        # Only split off as many words as the threshold needs
+        check_format = len(content.split(maxsplit=_MIN_FORMAT_CHECK_WORDS - 1)) >= _MIN_FORMAT_CHECK_WORDS
+        
+        features = self._scan_features(content, _COMMON_FEATURES + _FORMAT_FEATURES.get(format_type, ()))
+        
         # Check for basic document elements
-        if not self._has_title_page_info(content):
+        if not features['title_page']:
             missing_info.append("Title page information (title, author, course, instructor, date)")
         
-        if not self._has_abstract(content):
-            if format_type in ['apa', 'ieee']:
-                missing_info.append("Abstract section")
+        if format_type in ['apa', 'ieee'] and not features['abstract']:
+            missing_info.append("Abstract section")
         
-        if not self._has_introduction(content):
+        if not features['introduction']:
             missing_info.append("Introduction section")
         
-        if not self._has_conclusion(content):
+        if not features['conclusion']:
             missing_info.append("Conclusion section")
         
         # Check for citations
-        citations = self.citation_manager.extract_citations(content)
+        if citations is None:
+            citations = self.citation_manager.extract_citations(content)
         if not citations:
             missing_info.append("Citations and references")
         
-        # Check for specific format requirements
-        if format_type == 'mla':
-            if not self._has_works_cited(content):
-                missing_info.append("Works Cited page")
-        
-        elif format_type == 'apa':
-            if not self._has_references(content):
-                missing_info.append("References page")
-            if not self._has_running_head(content):
-                missing_info.append("Running head")
-        
-        elif format_type == 'chicago':
-            if not self._has_footnotes(content) and not self._has_bibliography(content):
-                missing_info.append("Footnotes or bibliography")
-        
-        elif format_type == 'ieee':
-            if not self._has_numbered_references(content):
-                missing_info.append("Numbered reference list")
+        # Check for specific format requirements (skipped for stub documents)
+        if check_format:
+            if format_type == 'mla':
+                if not features['works_cited']:
+                    missing_info.append("Works Cited page")
+            
+            elif format_type == 'apa':
+                if not features['references']:
+                    missing_info.append("References page")
+                if not features['running_head']:
+                    missing_info.append("Running head")
+            
+            elif format_type == 'chicago':
+                if not features['footnotes'] and not features['bibliography']:
+                    missing_info.append("Footnotes or bibliography")
+            
+            elif format_type == 'ieee':
+                if not features['numbered_references']:
+                    missing_info.append("Numbered reference list")
         
         # Check for quotes
-        if not self._has_proper_quotes(content):
+        if not features['proper_quotes']:
             missing_info.append("Properly formatted quotations")
         
         # Check for page numbers
-        if not self._has_page_numbers(content):
+        if not features['page_numbers']:
             missing_info.append("Page numbering")
         
         return missing_info
@@ -110,137 +175,50 @@ class DocumentProcessor:
         """
         Analyze the structure of the document
         """
+        features = self._scan_features(content, _STRUCTURE_FEATURES)
         analysis = {
             'sections': [],
-            'paragraphs': len(content.split('\n\n')),
+            # Non-overlapping '\n\n' runs split the content into one more paragraph than their count
+            'paragraphs': content.count('\n\n') + 1,
             'word_count': len(content.split()),
-            'has_quotes': self._has_quotes(content),
-            'has_citations': self._has_citations(content),
-            'has_numbers': self._has_numbers(content),
-            'has_dates': self._has_dates(content)
+            'has_quotes': '"' in content or "'" in content,
+            'has_citations': features['citations'],
+            'has_numbers': features['numbers'],
+            'has_dates': features['dates']
         }
         
-        # Identify sections
-        lines = content.split('\n')
+        # Identify sections, streaming lines instead of holding a split copy of the document
         current_section = None
         
-        for line in lines:
+        for line in io.StringIO(content):
             line = line.strip()
-            if line and line.isupper() or self._is_section_header(line):
+            if line and (line.isupper() or HEADER_RE.match(line)):
                 current_section = line
                 analysis['sections'].append(current_section)
         
         return analysis
     
-    def _has_title_page_info(self, content: str) -> bool:
-        """Check if document has title page information"""
-        title_indicators = ['title:', 'author:', 'course:', 'instructor:', 'date:']
-        content_lower = content.lower()
-        return any(indicator in content_lower for indicator in title_indicators)
-    
-    def _has_abstract(self, content: str) -> bool:
-        """Check if document has an abstract"""
-        abstract_patterns = [r'\babstract\b', r'\bsummary\b']
-        content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in abstract_patterns)
-    
-    def _has_introduction(self, content: str) -> bool:
-        """Check if document has an introduction"""
-        intro_patterns = [r'\bintroduction\b', r'\bintro\b']
-        content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in intro_patterns)
-    
-    def _has_conclusion(self, content: str) -> bool:
-        """Check if document has a conclusion"""
-        conclusion_patterns = [r'\bconclusion\b', r'\bconcluding\b']
-        content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in conclusion_patterns)
-    
-    def _has_works_cited(self, content: str) -> bool:
-        """Check if document has works cited page"""
-        works_cited_patterns = [r'\bworks cited\b', r'\bbibliography\b']
-        content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in works_cited_patterns)
-    
-    def _has_references(self, content: str) -> bool:
-        """Check if document has references page"""
-        references_patterns = [r'\breferences\b', r'\breference list\b']
-        content_lower = content.lower()
-        return any(re.search(pattern, content_lower) for pattern in references_patterns)
-    
-    def _has_running_head(self, content: str) -> bool:
-        """Check if document has running head"""
-        return 'running head' in content.lower()
-    
-    def _has_footnotes(self, content: str) -> bool:
-        """Check if document has footnotes"""
-        footnote_patterns = [r'\d+\.\s', r'\[\d+\]']
-        return any(re.search(pattern, content) for pattern in footnote_patterns)
-    
-    def _has_bibliography(self, content: str) -> bool:
-        """Check if document has bibliography"""
-        return 'bibliography' in content.lower()
-    
-    def _has_numbered_references(self, content: str) -> bool:
-        """Check if document has numbered references"""
-        numbered_ref_pattern = r'\[\d+\]'
-        return bool(re.search(numbered_ref_pattern, content))
-    
-    def _has_proper_quotes(self, content: str) -> bool:
-        """Check if document has properly formatted quotes"""
-        quote_patterns = [r'"[^"]*"', r"'[^']*'"]
-        return any(re.search(pattern, content) for pattern in quote_patterns)
-    
-    def _has_page_numbers(self, content: str) -> bool:
-        """Check if document has page numbers"""
-        page_patterns = [r'page \d+', r'p\. \d+', r'pp\. \d+']
-        return any(re.search(pattern, content.lower()) for pattern in page_patterns)
-    
-    def _has_quotes(self, content: str) -> bool:
-        """Check if document contains quotes"""
-        return '"' in content or "'" in content
-    
-    def _has_citations(self, content: str) -> bool:
-        """Check if document contains citations"""
-        citation_patterns = [r'\([^)]*\)', r'\[[^\]]*\]']
-        return any(re.search(pattern, content) for pattern in citation_patterns)
-    
-    def _has_numbers(self, content: str) -> bool:
-        """Check if document contains numbers"""
-        return bool(re.search(r'\d+', content))
-    
-    def _has_dates(self, content: str) -> bool:
-        """Check if document contains dates"""
-        date_patterns = [r'\d{4}', r'\d{1,2}/\d{1,2}/\d{4}']
-        return any(re.search(pattern, content) for pattern in date_patterns)
-    
-    def _is_section_header(self, line: str) -> bool:
-        """Check if a line is a section header"""
-        if not line:
-            return False
-        
-        # Check if line is all caps or has common header patterns
-        header_patterns = [
-            r'^[A-Z\s]+$',  # All caps
-            r'^\d+\.\s+[A-Z]',  # Numbered sections
-            r'^[A-Z][a-z]+(\s+[A-Z][a-z]+)*$'  # Title case
-        ]
-        
-        return any(re.match(pattern, line) for pattern in header_patterns)
+    def _scan_features(self, content: str, features: Tuple[str, ...]) -> Dict[str, bool]:
+        """
+        Check which of the given document features are present
+        """
+        return {feature: bool(_FEATURE_PATTERNS[feature].search(content)) for feature in features}
     
     def get_document_statistics(self, content: str) -> Dict[str, Any]:
         """
         Get comprehensive statistics about the document
         """
-        words = content.split()
-        sentences = re.split(r'[.!?]+', content)
+        word_count = len(content.split())
+        # Count sentence terminators rather than splitting out every sentence;
+        # n terminators split the text into n + 1 pieces
+        sentence_count = len(SENTENCE_END_RE.findall(content)) + 1
         paragraphs = [p for p in content.split('\n\n') if p.strip()]
         
         return {
-            'word_count': len(words),
-            'sentence_count': len(sentences),
+            'word_count': word_count,
+            'sentence_count': sentence_count,
             'paragraph_count': len(paragraphs),
             'character_count': len(content),
-            'average_words_per_sentence': len(words) / max(len(sentences), 1),
-            'average_sentences_per_paragraph': len(sentences) / max(len(paragraphs), 1)
+            'average_words_per_sentence': word_count / sentence_count,
+            'average_sentences_per_paragraph': sentence_count / max(len(paragraphs), 1)
         }
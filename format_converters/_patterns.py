@@ -0,0 +1,8 @@
+# Regex patterns shared by the format converters
+import re
+
+# Section headers: all caps, title case, or numbered sections
+HEADER_RE = re.compile(r'^(?:(?:[A-Z\s]+|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)$|\d+\.\s+[A-Z])')
+
+# Runs of sentence-ending punctuation
+SENTENCE_END_RE = re.compile(r'[.!?]+')
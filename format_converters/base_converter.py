@@ -1,17 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterable, List, Any, Mapping, Optional, Tuple
+import re
+from citation_manager import Citation, CitationManager
+from ._patterns import HEADER_RE
 
 class BaseConverter(ABC):
     """
     Base class for all format converters
     """
     
-    def __init__(self):
+    def __init__(self, citation_manager: Optional[CitationManager] = None):
         self.name = self.__class__.__name__
         self.format_rules = self._get_format_rules()
+        self.citation_manager = citation_manager if citation_manager is not None else CitationManager()
     
     @abstractmethod
-    def _get_format_rules(self) -> Dict[str, Any]:
+    def _get_format_rules(self) -> Mapping[str, Any]:
         """
         Return the formatting rules for this style
         """
@@ -19,12 +23,56 @@ class BaseConverter(ABC):
     
     @abstractmethod
     def convert(self, content: str, metadata: Dict[str, Any], 
-                citations: List[Dict[str, Any]], analysis: Dict[str, Any]) -> str:
+                citations: List[Citation], analysis: Dict[str, Any]) -> str:
         """
         Convert the document to the specified format
         """
         pass
     
+    def _citation_replacer(self, citations: List[Citation],
+                           format_citation: Callable[[Citation], str]) -> Callable[[str], str]:
+        """
+        Build a function that swaps every citation text for its formatted version in one pass
+        """
+        return self._text_replacer((citation.text, format_citation(citation)) for citation in citations)
+    
+    def _text_replacer(self, replacements: Iterable[Tuple[str, str]]) -> Callable[[str], str]:
+        """
+        Build a function that applies (text, replacement) pairs in one pass; the first pair for a text wins
+        """
+        lookup = {}
+        for text, replacement in replacements:
+            if text and text not in lookup:
+                lookup[text] = replacement
+        
+        if not lookup:
+            return lambda text: text
+        
+        # Longest texts first so a citation is never shadowed by a shorter one it contains
+        pattern = re.compile('|'.join(re.escape(text) for text in sorted(lookup, key=len, reverse=True)))
+        return lambda text: pattern.sub(lambda match: lookup[match.group(0)], text)
+    
+    def _format_paragraphs(self, content: str, format_paragraph: Callable[[str], str]) -> str:
+        """
+        Run every non-empty paragraph through format_paragraph and indent it
+        """
+        formatted_paragraphs = []
+        append = formatted_paragraphs.append
+        
+        for paragraph in content.split('\n\n'):
+            # Strip once, after formatting; citation texts are never blank, so a blank
+            # paragraph comes back blank and is still skipped
+            paragraph = format_paragraph(paragraph).strip()
+            if paragraph:
+                append(paragraph)
+        
+        if not formatted_paragraphs:
+            return ""
+        
+        # Indent through the separator so the join copies each paragraph only once
+        formatted_paragraphs[0] = "    " + formatted_paragraphs[0]
+        return "\n\n    ".join(formatted_paragraphs)
+    
     def create_title_page(self, metadata: Dict[str, Any]) -> str:
         """
         Create a title page according to the format rules
@@ -35,27 +83,90 @@ class BaseConverter(ABC):
         """
         Format headers according to the style
         """
-        pass
+        lines = content.split('\n')
+        formatted_lines = []
+        
+        for line in lines:
+            # Check if line is a header
+            if self._is_header(line):
+                # Set the header off on its own lines
+                formatted_lines.append(f"\n{line.strip()}\n")
+            else:
+                formatted_lines.append(line)
+        
+        return '\n'.join(formatted_lines)
+    
+    def _is_header(self, line: str) -> bool:
+        """
+        Check if a line is a header
+        """
+        line = line.strip()
+        if not line:
+            return False
+        
+        # Every header starts with a capital or a section number; skip the regex for body prose
+        first = line[0]
+        if not (first.isupper() or first.isdigit()):
+            return False
+        
+        # Check for common header patterns
+        return bool(HEADER_RE.match(line))
     
     def format_quotes(self, content: str) -> str:
         """
         Format quotations according to the style
         """
-        pass
+        # Nothing to format without any quotation marks
+        if '"' not in content and "'" not in content:
+            return content
+        
+        lines = content.split('\n')
+        formatted_lines = []
+        
+        for line in lines:
+            # Check for quotes in the line
+            if '"' in line or "'" in line:
+                # Format as short quote with proper indentation
+                line = self._format_short_quote(line)
+            formatted_lines.append(line)
+        
+        return '\n'.join(formatted_lines)
+    
+    def _format_short_quote(self, line: str) -> str:
+        """
+        Format a short quote according to the style
+        """
+        # Quotation marks are kept as typed
+        return line
     
     def add_page_numbers(self, content: str) -> str:
         """
         Add page numbers according to the style
         """
-        pass
+        # This would typically be done in a word processor
+        # For text output, we'll add page numbers at the bottom
+        lines = content.split('\n')
+        page_number = 1
+        formatted_lines = []
+        start = 0
+        
+        # Add page number every 25 lines (approximate page break), after lines 25, 50, ...
+        for end in range(26, len(lines) + 1, 25):
+            formatted_lines.extend(lines[start:end])
+            formatted_lines.append(f"\n{page_number}\n")
+            page_number += 1
+            start = end
+        formatted_lines.extend(lines[start:])
+        
+        return '\n'.join(formatted_lines)
     
-    def format_citations(self, content: str, citations: List[Dict[str, Any]]) -> str:
+    def format_citations(self, content: str, citations: List[Citation]) -> str:
         """
         Format in-text citations according to the style
         """
         pass
     
-    def create_references_page(self, citations: List[Dict[str, Any]]) -> str:
+    def create_references_page(self, citations: List[Citation]) -> str:
         """
         Create the references/works cited page
         """
@@ -4,6 +4,7 @@ Test script for the AI Document Formatting Agent
 """
 
 import os
+import re
 from dotenv import load_dotenv
 from document_processor import DocumentProcessor
 from citation_manager import CitationManager
@@ -120,6 +121,57 @@ def test_citation_extraction():
     for i, citation in enumerate(citations, 1):
         print(f"  {i}. {citation}")
 
+def test_ieee_citation_numbering():
+    """
+    Test that IEEE in-text numbers match the reference list
+    """
+    print("\n🔢 Testing IEEE citation numbering...")
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ OpenAI API key not found. Please set OPENAI_API_KEY in your .env file")
+        return
+    
+    # A repeated citation plus distinct numbered references
+    sample_text = "First (Smith, 2020). Then (Smith, 2020). Also (Jones, 2021). See [1] and [2]."
+    
+    doc_processor = DocumentProcessor()
+    formatted_doc = doc_processor.format_document(
+        content=sample_text,
+        format_type='ieee',
+        metadata={'title': 'Citation Numbering'}
+    )
+    
+    body, references = formatted_doc.split("\n\nReferences\n\n")
+    listed = re.findall(r'^\[(\d+)\]', references, re.MULTILINE)
+    cited = set(re.findall(r'\[(\d+)\]', body))
+    
+    # Smith once, Jones, [1] and [2], numbered in order
+    assert listed == ['1', '2', '3', '4'], listed
+    assert cited <= set(listed), (cited, listed)
+    
+    print("✅ In-text numbers match the reference list")
+
+def test_multi_citation_parenthetical():
+    """
+    Test that every citation in a multi-citation parenthetical is extracted
+    """
+    print("\n📚 Testing multi-citation parentheticals...")
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ OpenAI API key not found. Please set OPENAI_API_KEY in your .env file")
+        return
+    
+    sample_text = "Prior work (Smith, 2020; Jones, 2019) and later studies (see Brown, 2021, p. 4; Davis, 2018) agree."
+    
+    citation_manager = CitationManager()
+    authors = {citation.author for citation in citation_manager.extract_citations(sample_text)}
+    
+    assert {'Smith', 'Jones', 'Brown', 'Davis'} <= authors, authors
+    
+    print("✅ All cited authors were found")
+
 if __name__ == "__main__":
     test_document_processing()
     test_citation_extraction()
+    test_ieee_citation_numbering()
+    test_multi_citation_parenthetical()
@@ -1,15 +1,66 @@
 import re
+from collections import Counter
+from functools import lru_cache
 from typing import List, Dict, Any
 
+# Compiled patterns
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\;\:\!\?\-\(\)\[\]\{\}\"\']')
+# The same character filter as a translate table, for ASCII text
+_ASCII_SPECIAL_CHARS = {code: None for code in range(128) if _SPECIAL_CHARS_RE.match(chr(code))}
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+_MULTI_SPACE_RE = re.compile(r' +')
+_MULTI_NEWLINE_RE = re.compile(r'\n+')
+_WORD_RE = re.compile(r'\b\w+\b')
+# Maps every ASCII non-word character to a space, so splitting ASCII text finds the same words as _WORD_RE
+_ASCII_NON_WORD_TO_SPACE = {code: ' ' for code in range(128) if not _WORD_RE.match(chr(code))}
+
+# Quoted text, each pattern scanned separately so an apostrophe can't swallow a real quotation;
+# exactly one group takes part in each match
+_QUOTE_PATTERNS = (
+    re.compile(
+        r'"([^"]*)"'  # Double quotes
+        r'|\u201c([^\u201d]*)\u201d'  # Curly double quotes
+        r'|\u2018([^\u2019]*)\u2019'  # Curly single quotes
+    ),
+    re.compile(r"'([^']*)'"),  # Single quotes
+)
+
+_DIGIT_RE = re.compile(r'\d')
+_WHOLE_NUMBER_RE = re.compile(r'\b\d+\b')  # Whole numbers
+_DECIMAL_NUMBER_RE = re.compile(r'\b\d+\.\d+\b')  # Decimal numbers
+_NUMERIC_DATE_RE = re.compile(r'\b\d{1,2}/\d{1,2}/\d{4}\b')  # Dates
+# Bytes twins of the number patterns; \b and \d mean the same on ASCII, without Unicode lookups
+_NUMBER_PATTERNS = (_WHOLE_NUMBER_RE, _DECIMAL_NUMBER_RE, _NUMERIC_DATE_RE)
+_ASCII_NUMBER_PATTERNS = tuple(re.compile(pattern.pattern.encode('ascii')) for pattern in _NUMBER_PATTERNS)
+
+# Each date pattern with the separator it can't match without (None if it has no fixed one)
+_DATE_PATTERNS = (
+    (re.compile(r'\b\d{1,2}/\d{1,2}/\d{4}\b', re.IGNORECASE), '/'),  # MM/DD/YYYY
+    (re.compile(r'\b\d{1,2}-\d{1,2}-\d{4}\b', re.IGNORECASE), '-'),  # MM-DD-YYYY
+    (re.compile(r'\b\d{4}-\d{1,2}-\d{1,2}\b', re.IGNORECASE), '-'),  # YYYY-MM-DD
+    (re.compile(r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}\b', re.IGNORECASE), None),  # Month DD, YYYY
+)
+
+# Common stop words left out of keyword extraction
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
+})
+
 def clean_text(text: str) -> str:
     """
     Clean and normalize text
     """
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     
     # Remove special characters that might cause issues
-    text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\(\)\[\]\{\}\"\']', '', text)
+    if text.isascii():
+        text = text.translate(_ASCII_SPECIAL_CHARS)
+    else:
+        text = _SPECIAL_CHARS_RE.sub('', text)
     
     return text.strip()
 
@@ -18,10 +69,10 @@ def extract_sentences(text: str) -> List[str]:
     Extract sentences from text
     """
     # Split on sentence endings
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SENTENCE_END_RE.split(text)
     
-    # Clean and filter empty sentences
-    sentences = [s.strip() for s in sentences if s.strip()]
+    # Clean and filter empty sentences, stripping each one once
+    sentences = [s for s in map(str.strip, sentences) if s]
     
     return sentences
 
@@ -32,8 +83,8 @@ def extract_paragraphs(text: str) -> List[str]:
     # Split on double newlines
     paragraphs = text.split('\n\n')
     
-    # Clean and filter empty paragraphs
-    paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    # Clean and filter empty paragraphs, stripping each one once
+    paragraphs = [p for p in map(str.strip, paragraphs) if p]
     
     return paragraphs
 
@@ -48,13 +99,19 @@ def count_characters(text: str) -> int:
     """
     Count characters in text (excluding whitespace)
     """
-    return len(text.replace(' ', ''))
+    # Subtract the spaces rather than building a copy without them
+    return len(text) - text.count(' ')
 
 def estimate_reading_time(text: str, words_per_minute: int = 200) -> float:
     """
     Estimate reading time in minutes
     """
-    word_count = count_words(text)
+    return _minutes_to_read(count_words(text), words_per_minute)
+
+def _minutes_to_read(word_count: int, words_per_minute: int = 200) -> float:
+    """
+    Reading time in minutes for an already-counted number of words
+    """
     return word_count / words_per_minute
 
 def find_quotes(text: str) -> List[Dict[str, Any]]:
@@ -63,18 +120,9 @@ def find_quotes(text: str) -> List[Dict[str, Any]]:
     """
     quotes = []
     
-    # Pattern for quoted text
-    quote_patterns = [
-        r'"([^"]*)"',  # Double quotes
-        r"'([^']*)'",  # Single quotes
-        r'"([^"]*)"',  # Curly double quotes
-        r"'([^']*)'",  # Curly single quotes
-    ]
-    
-    for pattern in quote_patterns:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            quote_text = match.group(1)
+    for pattern in _QUOTE_PATTERNS:
+        for match in pattern.finditer(text):
+            quote_text = match.group(match.lastindex)
             if len(quote_text.strip()) > 0:
                 quotes.append({
                     'text': quote_text,
@@ -91,19 +139,26 @@ def find_numbers(text: str) -> List[Dict[str, Any]]:
     """
     numbers = []
     
-    # Pattern for various number formats
-    number_patterns = [
-        r'\b\d+\b',  # Whole numbers
-        r'\b\d+\.\d+\b',  # Decimal numbers
-        r'\b\d{4}\b',  # Years
-        r'\b\d{1,2}/\d{1,2}/\d{4}\b',  # Dates
-    ]
+    # Every number pattern needs a digit
+    if not _DIGIT_RE.search(text):
+        return numbers
+    
+    # ASCII text is scanned as bytes, where offsets are the same as string indices
+    if text.isascii():
+        subject, to_text = text.encode('ascii'), bytes.decode
+        whole_number_re, decimal_number_re, numeric_date_re = _ASCII_NUMBER_PATTERNS
+    else:
+        subject, to_text = text, str
+        whole_number_re, decimal_number_re, numeric_date_re = _NUMBER_PATTERNS
     
-    for pattern in number_patterns:
-        matches = re.finditer(pattern, text)
+    # Years (\b\d{4}\b) are exactly the four-digit whole numbers, so they reuse that scan
+    whole_numbers = list(whole_number_re.finditer(subject))
+    years = [match for match in whole_numbers if match.end() - match.start() == 4]
+    
+    for matches in (whole_numbers, decimal_number_re.finditer(subject), years, numeric_date_re.finditer(subject)):
         for match in matches:
             numbers.append({
-                'text': match.group(0),
+                'text': to_text(match.group(0)),
                 'start': match.start(),
                 'end': match.end(),
                 'type': 'number'
@@ -117,16 +172,16 @@ def find_dates(text: str) -> List[Dict[str, Any]]:
     """
     dates = []
     
-    # Pattern for various date formats
-    date_patterns = [
-        r'\b\d{1,2}/\d{1,2}/\d{4}\b',  # MM/DD/YYYY
-        r'\b\d{1,2}-\d{1,2}-\d{4}\b',  # MM-DD-YYYY
-        r'\b\d{4}-\d{1,2}-\d{1,2}\b',  # YYYY-MM-DD
-        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}\b',  # Month DD, YYYY
-    ]
+    # Every date pattern needs a digit
+    if not _DIGIT_RE.search(text):
+        return dates
     
-    for pattern in date_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
+    for pattern, separator in _DATE_PATTERNS:
+        # A substring check rules out a pattern far faster than a failed regex scan
+        if separator and separator not in text:
+            continue
+        
+        matches = pattern.finditer(text)
         for match in matches:
             dates.append({
                 'text': match.group(0),
@@ -141,17 +196,34 @@ def analyze_text_structure(text: str) -> Dict[str, Any]:
     """
     Analyze the structure of text
     """
+    analysis = _analyze_text_structure_cached(text)
+    
+    # Hand out fresh match lists so callers can't modify the cached result
+    return {
+        **analysis,
+        'quotes': [dict(match) for match in analysis['quotes']],
+        'numbers': [dict(match) for match in analysis['numbers']],
+        'dates': [dict(match) for match in analysis['dates']]
+    }
+
+@lru_cache(maxsize=16)
+def _analyze_text_structure_cached(text: str) -> Dict[str, Any]:
+    """
+    Analyze the structure of text, remembering the last few documents analyzed
+    """
+    # Count and split once; every derived figure reuses these
+    word_count = count_words(text)
     sentences = extract_sentences(text)
     paragraphs = extract_paragraphs(text)
     
     analysis = {
-        'word_count': count_words(text),
+        'word_count': word_count,
         'character_count': count_characters(text),
         'sentence_count': len(sentences),
         'paragraph_count': len(paragraphs),
-        'average_words_per_sentence': count_words(text) / max(len(sentences), 1),
+        'average_words_per_sentence': word_count / max(len(sentences), 1),
         'average_sentences_per_paragraph': len(sentences) / max(len(paragraphs), 1),
-        'reading_time_minutes': estimate_reading_time(text),
+        'reading_time_minutes': _minutes_to_read(word_count),
         'quotes': find_quotes(text),
         'numbers': find_numbers(text),
         'dates': find_dates(text)
@@ -164,10 +236,10 @@ def normalize_whitespace(text: str) -> str:
     Normalize whitespace in text
     """
     # Replace multiple spaces with single space
-    text = re.sub(r' +', ' ', text)
+    text = _MULTI_SPACE_RE.sub(' ', text)
     
     # Replace multiple newlines with double newlines
-    text = re.sub(r'\n+', '\n\n', text)
+    text = _MULTI_NEWLINE_RE.sub('\n\n', text)
     
     # Remove leading/trailing whitespace
     text = text.strip()
@@ -178,26 +250,17 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """
     Extract keywords from text (simple implementation)
     """
-    # Remove common stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-        'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
-        'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
-    }
-    
-    # Convert to lowercase and split into words
-    words = re.findall(r'\b\w+\b', text.lower())
-    
-    # Remove stop words and short words
-    words = [word for word in words if word not in stop_words and len(word) > 3]
+    # Convert to lowercase and split into words; ASCII text skips the regex
+    text = text.lower()
+    if text.isascii():
+        tokens = text.translate(_ASCII_NON_WORD_TO_SPACE).split()
+    else:
+        tokens = _WORD_RE.findall(text)
     
-    # Count word frequency
-    word_freq = {}
-    for word in words:
-        word_freq[word] = word_freq.get(word, 0) + 1
+    # Drop short words and stop words in the same pass
+    words = [word for word in tokens if len(word) > 3 and word not in _STOP_WORDS]
     
-    # Sort by frequency and return top keywords
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    keywords = [word for word, freq in sorted_words[:max_keywords]]
+    # Count word frequency and return the top keywords (ties keep first-seen order)
+    keywords = [word for word, freq in Counter(words).most_common(max_keywords)]
     
     return keywords